@@ -0,0 +1,250 @@
+from collections import defaultdict, deque
+from datetime import datetime
+import json
+import logging
+import operator
+import queue
+import threading
+import urllib.request
+
+logger = logging.getLogger(__name__)
+
+ALL_TURMAS = '*'
+
+OPERATORS = {
+    '>': operator.gt,
+    '>=': operator.ge,
+    '<': operator.lt,
+    '<=': operator.le,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+AGGREGATIONS = {'sum': 0, 'last': 1, 'count': 2}
+
+class Rule:
+    """Regra declarativa avaliada sobre os agregados correntes de uma Turma.
+
+    O valor agregado de ``tipo`` é comparado com ``value`` ou, se
+    ``compare_to`` for informado, com o agregado desse outro Tipo (da mesma
+    Turma, ou da linha inteira quando a Turma ainda não o enviou).
+    """
+
+    def __init__(self, name, tipo, op, value=None, compare_to=None, agg='sum',
+                 compare_agg='last', turma=None, severity='warning', message=None):
+        if op not in OPERATORS:
+            raise ValueError(f"Operador inválido na regra {name!r}: {op!r}")
+        if agg not in AGGREGATIONS or compare_agg not in AGGREGATIONS:
+            raise ValueError(f"Agregação inválida na regra {name!r}")
+        if (value is None) == (compare_to is None):
+            raise ValueError(f"A regra {name!r} precisa de 'value' ou 'compare_to'")
+
+        self.name = name
+        self.tipo = tipo
+        self.op = op
+        self.value = value
+        self.compare_to = compare_to
+        self.agg = agg
+        self.compare_agg = compare_agg
+        self.turma = turma
+        self.severity = severity
+        self.message = message
+
+    @classmethod
+    def from_dict(cls, config):
+        return cls(**config)
+
+    @property
+    def tipos(self):
+        return (self.tipo,) if self.compare_to is None else (self.tipo, self.compare_to)
+
+class RunningAggregates:
+    """Soma, último valor e contagem por (Turma, Tipo), atualizados a cada envio."""
+
+    def __init__(self):
+        self.values = defaultdict(lambda: [0.0, 0.0, 0])
+
+    def update(self, records):
+        for record in records:
+            valor = float(record['Valor'])
+            for turma in (record['Turma'], ALL_TURMAS):
+                entry = self.values[(turma, record['Tipo'])]
+                entry[0] += valor
+                entry[1] = valor
+                entry[2] += 1
+
+    def get(self, turma, tipo, agg):
+        entry = self.values.get((turma, tipo))
+        if entry is None:
+            return None
+        return entry[AGGREGATIONS[agg]]
+
+def log_sink(alert):
+    logger.warning("ALERTA [%s] %s", alert['line'], alert['message'])
+
+class WebhookSink:
+    """Envia cada alerta como JSON via POST, fora da thread de ingestão.
+
+    Uma única thread consome uma fila limitada; com a fila cheia, o alerta
+    é descartado e registrado no log.
+    """
+
+    def __init__(self, url, timeout=5, max_queue=1000):
+        self.url = url
+        self.timeout = timeout
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def _run(self):
+        while True:
+            self._post(self.queue.get())
+            self.queue.task_done()
+
+    def _post(self, alert):
+        try:
+            body = json.dumps(alert).encode('utf-8')
+            req = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+            urllib.request.urlopen(req, timeout=self.timeout).close()
+        except Exception:
+            logger.exception("Falha ao enviar alerta para %s", self.url)
+
+    def __call__(self, alert):
+        try:
+            self.queue.put_nowait(alert)
+        except queue.Full:
+            logger.warning("Fila do webhook cheia, alerta descartado: %s", alert['message'])
+
+class AlertEngine:
+    """Avalia regras incrementalmente a cada envio de dados de uma linha.
+
+    Os agregados por Turma são mantidos em memória por linha; o histórico só
+    é lido uma vez, na primeira avaliação da linha. Cada envio custa
+    O(registros + regras que citam os Tipos enviados).
+    """
+
+    def __init__(self, rules, sinks=None, max_alerts=50):
+        self.rules = [rule if isinstance(rule, Rule) else Rule.from_dict(rule) for rule in rules]
+        self.sinks = list(sinks) if sinks is not None else [log_sink]
+        self.max_alerts = max_alerts
+        self.locks = {}
+        self.locks_lock = threading.Lock()
+        self.aggregates = {}
+        self.alerts = defaultdict(lambda: deque(maxlen=self.max_alerts))
+
+        self.rules_by_tipo = defaultdict(list)
+        for rule in self.rules:
+            for tipo in rule.tipos:
+                self.rules_by_tipo[tipo].append(rule)
+
+    def _line_lock(self, line):
+        with self.locks_lock:
+            lock = self.locks.get(line)
+            if lock is None:
+                lock = self.locks[line] = threading.Lock()
+            return lock
+
+    def _line_aggregates(self, line, history):
+        aggregates = self.aggregates.get(line)
+        if aggregates is None:
+            aggregates = RunningAggregates()
+            primed = history is not None
+            if primed:
+                aggregates.update(history())
+            self.aggregates[line] = aggregates
+            return aggregates, primed
+        return aggregates, False
+
+    def _check(self, rule, line, turma, aggregates, timestamp):
+        if rule.turma is not None and rule.turma != turma:
+            return None
+
+        value = aggregates.get(turma, rule.tipo, rule.agg)
+        if value is None:
+            return None
+
+        if rule.compare_to is None:
+            threshold = rule.value
+        else:
+            threshold = aggregates.get(turma, rule.compare_to, rule.compare_agg)
+            if threshold is None:
+                threshold = aggregates.get(ALL_TURMAS, rule.compare_to, rule.compare_agg)
+            if threshold is None:
+                return None
+
+        if not OPERATORS[rule.op](value, threshold):
+            return None
+
+        reference = f"{threshold:g}" if rule.compare_to is None else f"{rule.compare_to} ({threshold:g})"
+        return {
+            'line': line,
+            'rule': rule.name,
+            'turma': turma,
+            'tipo': rule.tipo,
+            'value': value,
+            'threshold': threshold,
+            'severity': rule.severity,
+            'message': rule.message or f"{turma}: {rule.tipo} {value:g} {rule.op} {reference}",
+            'timestamp': timestamp
+        }
+
+    def evaluate(self, line, records, history=None):
+        """Atualiza os agregados com ``records`` e devolve os alertas disparados.
+
+        ``history`` é chamado apenas se a linha ainda não tem agregados em
+        memória e deve devolver todos os registros já gravados, incluindo
+        ``records``. Sem ``history``, a linha começa vazia.
+
+        Os alertas não são publicados aqui; chame ``publish`` depois de
+        liberar qualquer lock de ingestão.
+        """
+        if not records:
+            return []
+
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        fired = []
+
+        with self._line_lock(line):
+            aggregates, primed = self._line_aggregates(line, history)
+            if not primed:
+                aggregates.update(records)
+
+            turmas = []
+            candidates = []
+            seen = set()
+            for record in records:
+                if record['Turma'] not in turmas:
+                    turmas.append(record['Turma'])
+                for rule in self.rules_by_tipo.get(record['Tipo'], ()):
+                    if id(rule) not in seen:
+                        seen.add(id(rule))
+                        candidates.append(rule)
+
+            for rule in candidates:
+                for turma in turmas:
+                    alert = self._check(rule, line, turma, aggregates, timestamp)
+                    if alert is not None:
+                        fired.append(alert)
+
+            self.alerts[line].extend(fired)
+
+        return fired
+
+    def publish(self, alerts):
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink(alert)
+                except Exception:
+                    logger.exception("Falha ao publicar alerta %s", alert['rule'])
+
+    def reset(self, line):
+        with self._line_lock(line):
+            self.aggregates.pop(line, None)
+            self.alerts.pop(line, None)
+
+    def recent(self, line, limit=None):
+        with self._line_lock(line):
+            alerts = list(self.alerts.get(line, ()))
+        alerts.reverse()
+        return alerts[:limit] if limit is not None else alerts
@@ -0,0 +1,115 @@
+"""Mede o custo do motor de alertas na ingestão de dados.
+
+Uso: python bench_alerts.py [--rules 100 300 1000] [--submissions 500] [--history 5000] [--repeats 5]
+
+Para cada quantidade de regras, mede o tempo médio de AlertEngine.evaluate
+por envio e o tempo de um envio completo (LineStore.append + evaluate, como
+faz /api/<linha>/add_data). O overhead é a diferença entre a ingestão com
+regras e a ingestão sem regras, usando a mediana de --repeats execuções.
+O histórico é gravado num diretório temporário.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from alerts import AlertEngine
+from index import LineStore
+
+TIPOS = [
+    'Relatos Abertos', 'Relatos Concluídos', 'Acidentes SPT', 'Acidentes CPT',
+    'Produção', 'Sucata', 'Retrabalho', 'Horas Extras', 'Treinamento Obrigatório',
+    'Treinamento Eletivo', 'Interrupção', 'Faltas', 'Custo Mensal', 'Meta'
+]
+TURMAS = ['Turma A', 'Turma B', 'Turma C', 'Turma D']
+
+def make_rules(count):
+    ops = ['>', '>=', '<', '<=']
+    rules = []
+    for i in range(count):
+        rule = {
+            'name': f"regra_{i}",
+            'tipo': random.choice(TIPOS),
+            'op': random.choice(ops),
+            'agg': random.choice(['sum', 'last', 'count']),
+            'turma': random.choice(TURMAS + [None])
+        }
+        if i % 3 == 0:
+            rule['compare_to'] = random.choice(TIPOS)
+        else:
+            rule['value'] = random.uniform(0, 100)
+        rules.append(rule)
+    return rules
+
+def make_submission():
+    turma = random.choice(TURMAS)
+    return [
+        {'Turma': turma, 'Tipo': tipo, 'Valor': random.uniform(0, 100), 'Timestamp': '2025-01-01 00:00:00'}
+        for tipo in TIPOS
+    ]
+
+def time_ingest(history, submissions, engine=None):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LineStore('bench', os.path.join(tmp, 'bench.json'), 'bench')
+        store.append(history)
+        if engine is not None:
+            engine.evaluate('bench', history, history=store.records)
+
+        start = time.perf_counter()
+        for records in submissions:
+            alerts = []
+            with store.lock:
+                store.append(records)
+                if engine is not None:
+                    alerts = engine.evaluate('bench', records, history=store.records)
+            if engine is not None:
+                engine.publish(alerts)
+        return (time.perf_counter() - start) / len(submissions)
+
+def time_evaluate(engine, history, submissions):
+    engine.evaluate('bench', history, history=lambda: history)
+
+    start = time.perf_counter()
+    for records in submissions:
+        engine.evaluate('bench', records)
+    return (time.perf_counter() - start) / len(submissions)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rules', type=int, nargs='+', default=[100, 300, 1000])
+    parser.add_argument('--submissions', type=int, default=500)
+    parser.add_argument('--history', type=int, default=5000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    random.seed(0)
+    history = [record for _ in range(args.history // len(TIPOS)) for record in make_submission()]
+    submissions = [make_submission() for _ in range(args.submissions)]
+    rules = {count: make_rules(count) for count in args.rules}
+
+    # As execuções são intercaladas para que a variação do disco afete
+    # igualmente a linha de base e cada quantidade de regras.
+    baseline_runs = []
+    ingest_runs = {count: [] for count in args.rules}
+    evaluate_runs = {count: [] for count in args.rules}
+    for _ in range(args.repeats):
+        baseline_runs.append(time_ingest(history, submissions))
+        for count in args.rules:
+            ingest_runs[count].append(time_ingest(history, submissions, AlertEngine(rules[count], sinks=[])))
+            evaluate_runs[count].append(time_evaluate(AlertEngine(rules[count], sinks=[]), history, submissions))
+
+    baseline = statistics.median(baseline_runs)
+    print(f"histórico: {len(history)} registros, envios: {len(submissions)}, repetições: {args.repeats} (medianas)")
+    print(f"{'regras':>8} {'evaluate (ms)':>14} {'ingestão (ms)':>14} {'overhead':>9}")
+    print(f"{0:>8} {0:>14.3f} {baseline * 1000:>14.3f} {'-':>9}")
+
+    for count in args.rules:
+        evaluate = statistics.median(evaluate_runs[count])
+        ingest = statistics.median(ingest_runs[count])
+        overhead = (ingest - baseline) / baseline * 100
+        print(f"{count:>8} {evaluate * 1000:>14.3f} {ingest * 1000:>14.3f} {overhead:>8.1f}%")
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
 import dash
-from dash import dcc, html, Input, Output, callback
+from dash import dcc, html, Input, Output, State, callback
+from dash.exceptions import PreventUpdate
 import plotly.graph_objs as go
 import plotly.express as px
 import pandas as pd
@@ -8,39 +9,229 @@ import dash_bootstrap_components as dbc
 from datetime import datetime, timedelta
 from flask import Flask, request, jsonify, send_from_directory
 import os
+import re
 import json
+import logging
+import threading
+from alerts import AlertEngine, WebhookSink, log_sink
 
 server = Flask(__name__)
 app = dash.Dash(
     __name__, 
     server=server,
     meta_tags=[{"name": "viewport", "content": "width=device-width, initial-scale=1.0"}],
-    external_stylesheets=[dbc.themes.BOOTSTRAP]
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    suppress_callback_exceptions=True
 )
 
+logger = logging.getLogger(__name__)
+
 DATA_FILE = 'dashboard_data.json'
+DATA_DIR = 'data'
+DEFAULT_LINE = 'lam1'
+DEFAULT_TITLE = 'GESTÃO LAMINAÇÃO A FRIO'
+# Orçamento de cache por linha, contado em bytes de JSON serializado. Em
+# memória, a lista de registros ocupa cerca de 4x o tamanho do JSON, então
+# 8 MB aqui equivalem a ~32 MB de RAM por linha.
+CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Estimativa do tamanho dos 9 gráficos de uma linha: um layout fixo por
+# gráfico mais os pontos, proporcionais ao JSON dos registros.
+FIGURES_BASE_BYTES = 64 * 1024
+FIGURES_BYTES_PER_RECORD_BYTE = 2
+
+# Linhas atendidas pelo app. Outras linhas precisam ser adicionadas aqui ou
+# com register_line(); ids desconhecidos recebem 404 em vez de criar um shard.
+LINES = {
+    DEFAULT_LINE: {'title': DEFAULT_TITLE, 'data_file': DATA_FILE}
+}
+
+ALERT_WEBHOOK_URL = os.environ.get('ALERT_WEBHOOK_URL')
+ALERT_BANNER_SIZE = 5
+
+# Regras avaliadas a cada envio em /api/<linha>/add_data. Ver alerts.Rule.
+ALERT_RULES = [
+    {'name': 'acidentes_cpt', 'tipo': 'Acidentes CPT', 'op': '>', 'value': 0,
+     'agg': 'sum', 'severity': 'danger'},
+    {'name': 'producao_abaixo_meta', 'tipo': 'Produção', 'op': '<', 'compare_to': 'Meta',
+     'agg': 'last', 'severity': 'warning'},
+    {'name': 'interrupcao_excedida', 'tipo': 'Interrupção', 'op': '>', 'value': 8,
+     'agg': 'last', 'severity': 'warning'}
+]
 
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, 'r') as f:
+LINE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,32}$')
+
+def load_data(path=DATA_FILE):
+    if os.path.exists(path):
+        with open(path, 'r') as f:
             return json.load(f)
     return []
 
-def save_data(data):
-    with open(DATA_FILE, 'w') as f:
-        json.dump(data, f)
+def save_data(data, path=DATA_FILE):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    payload = json.dumps(data)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+class TenantCache:
+    """Cache LRU de uma linha, limitado por um orçamento aproximado de bytes."""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            self.entries.move_to_end(key)
+        except KeyError:
+            pass
+        return entry[0]
+
+    def put(self, key, value, size):
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.total_bytes += size
+        while self.total_bytes > self.max_bytes:
+            _, (_, evicted_size) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_size
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+class LineStore:
+    """Shard de dados de uma linha com lock e caches próprios.
+
+    Cada gravação incrementa ``version``; agregados e gráficos são
+    guardados por versão, então uma linha nunca invalida o cache de outra.
+    """
+
+    def __init__(self, line, data_file, title, cache_max_bytes=CACHE_MAX_BYTES):
+        self.line = line
+        self.data_file = data_file
+        self.title = title
+        self.lock = threading.RLock()
+        self.version = 0
+        self.records_bytes = 0
+        self.cache = TenantCache(cache_max_bytes)
+
+    def _records_locked(self):
+        records = self.cache.get(('records', self.version))
+        if records is None:
+            records = load_data(self.data_file)
+            size = os.path.getsize(self.data_file) if os.path.exists(self.data_file) else 0
+            self.records_bytes = size
+            self.cache.put(('records', self.version), records, size)
+        return records
+
+    def snapshot(self):
+        with self.lock:
+            return self.version, self._records_locked()
+
+    def records(self):
+        return self.snapshot()[1]
+
+    def _commit_locked(self, records):
+        size = save_data(records, self.data_file)
+        self.version += 1
+        self.records_bytes = size
+        self.cache.clear()
+        self.cache.put(('records', self.version), records, size)
+
+    def append(self, new_records):
+        with self.lock:
+            records = self._records_locked() + list(new_records)
+            self._commit_locked(records)
+            return self.version
+
+    def clear(self):
+        with self.lock:
+            self._commit_locked([])
+            return self.version
+
+    def _cached(self, name, build, measure):
+        with self.lock:
+            version, records = self.version, self._records_locked()
+            value = self.cache.get((name, version))
+        if value is None:
+            value = build(records)
+            with self.lock:
+                if version == self.version:
+                    self.cache.put((name, version), value, measure(value))
+        return value
 
-initial_data = load_data()
+    def aggregates(self):
+        def build(records):
+            kpis = calculate_kpis(records)
+            costs = calculate_costs(records)
+            return {
+                'kpis': {key: float(value) for key, value in kpis.items()},
+                'costs': {key: float(value) for key, value in costs.items()}
+            }
+        return self._cached('aggregates', build, lambda value: len(json.dumps(value)))
 
-if not initial_data:
-    INITIAL_DATA = {
-        "Tipo": pd.Series(dtype='str'),
-        "Valor": pd.Series(dtype='float'),
-        "Turma": pd.Series(dtype='str')
+    def figures(self):
+        return self._cached(
+            'figures',
+            generate_graphs,
+            lambda figs: FIGURES_BASE_BYTES + FIGURES_BYTES_PER_RECORD_BYTE * self.records_bytes
+        )
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def register_line(line, title=None, data_file=None):
+    if not line or LINE_ID_PATTERN.match(line) is None:
+        raise ValueError(f"Linha inválida: {line!r}")
+
+    LINES[line] = {
+        'title': title or f"{DEFAULT_TITLE} - LINHA {line.upper()}",
+        'data_file': data_file or os.path.join(DATA_DIR, f"{line}.json")
     }
-    initial_df = pd.DataFrame(INITIAL_DATA)
-    initial_data = initial_df.to_dict('records')
-    save_data(initial_data)
+
+def is_valid_line(line):
+    return line in LINES
+
+def get_store(line):
+    if not is_valid_line(line):
+        raise KeyError(f"Linha não encontrada: {line!r}")
+
+    with _stores_lock:
+        store = _stores.get(line)
+        if store is None:
+            config = LINES[line]
+            store = LineStore(line, config['data_file'], config['title'])
+            _stores[line] = store
+        return store
+
+alert_sinks = [log_sink]
+if ALERT_WEBHOOK_URL:
+    alert_sinks.append(WebhookSink(ALERT_WEBHOOK_URL))
+
+alert_engine = AlertEngine(ALERT_RULES, sinks=alert_sinks)
+
+def known_lines():
+    return list(LINES)
+
+def line_from_path(pathname):
+    parts = [part for part in (pathname or '/').split('/') if part]
+    if not parts:
+        return DEFAULT_LINE
+    if len(parts) == 2 and parts[0] == 'line' and is_valid_line(parts[1]):
+        return parts[1]
+    return None
 
 colors = {
     'primary': '#1A5276',
@@ -452,171 +643,270 @@ current_date = datetime.now()
 current_month = current_date.month
 month_name = current_date.strftime("%B")
 
-header = dbc.Container([
-    dbc.Row([
-        dbc.Col(html.Img(src="/assets/logo.png", height="60px"), width=2),
-        dbc.Col(html.H3("GESTÃO LAMINAÇÃO A FRIO", id="dashboard-title"), width=8),
-        dbc.Col([
-            html.Div([
-                html.Span(f"Mês: {month_name}"),
-                html.Br(),
-                html.Span(current_date.strftime('%d/%m/%Y'))
-            ], className="date-display")
-        ], width=2)
-    ], className="header-row"),
+def build_header(title):
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col(html.Img(src="/assets/logo.png", height="60px"), width=2),
+            dbc.Col(html.H3(title, id="dashboard-title"), width=8),
+            dbc.Col([
+                html.Div([
+                    html.Span(f"Mês: {month_name}"),
+                    html.Br(),
+                    html.Span(current_date.strftime('%d/%m/%Y'))
+                ], className="date-display")
+            ], width=2)
+        ], className="header-row"),
     
-    html.Hr(className="my-4")
-], fluid=True, className="dashboard-header")
+        html.Hr(className="my-4")
+    ], fluid=True, className="dashboard-header")
 
-app.layout = dbc.Container([
-    dcc.Interval(
-        id='interval-component',
-        interval=5*1000,
-        n_intervals=0
-    ),
+def build_alert_banner(line):
+    return [
+        dbc.Alert(
+            f"{alert['timestamp']} - {alert['message']}",
+            color=alert['severity'],
+            className="mb-2"
+        )
+        for alert in alert_engine.recent(line, limit=ALERT_BANNER_SIZE)
+    ]
+
+def build_dashboard(store):
+    figures = store.figures()
+    costs = store.aggregates()['costs']
     
-    header,
-    
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader(html.H4("SEGURANÇA", className="section-header")),
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='relatos-chart',
-                        figure=generate_graphs(initial_data)[0],
-                        config=chart_config,
-                        className="dashboard-chart"
-                    ),
-                    dcc.Graph(
-                        id='acidentes-chart',
-                        figure=generate_graphs(initial_data)[1],
-                        config=chart_config,
-                        className="dashboard-chart"
-                    )
-                ])
-            ], className="dashboard-card")
-        ], lg=4, md=6, sm=12),
+    return dbc.Container([
+        build_header(store.title),
         
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader(html.H4("QUALIDADE", className="section-header")),
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='sucata-chart',
-                        figure=generate_graphs(initial_data)[2],
-                        config=chart_config,
-                        className="dashboard-chart"
-                    ),
-                    dcc.Graph(
-                        id='retrabalho-chart',
-                        figure=generate_graphs(initial_data)[3],
-                        config=chart_config,
-                        className="dashboard-chart"
-                    )
-                ])
-            ], className="dashboard-card")
-        ], lg=4, md=6, sm=12),
+        html.Div(build_alert_banner(store.line), id='alert-banner'),
+    
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("SEGURANÇA", className="section-header")),
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='relatos-chart',
+                            figure=figures[0],
+                            config=chart_config,
+                            className="dashboard-chart"
+                        ),
+                        dcc.Graph(
+                            id='acidentes-chart',
+                            figure=figures[1],
+                            config=chart_config,
+                            className="dashboard-chart"
+                        )
+                    ])
+                ], className="dashboard-card")
+            ], lg=4, md=6, sm=12),
         
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader(html.H4("PRODUÇÃO", className="section-header")),
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='producao-chart',
-                        figure=generate_graphs(initial_data)[4],
-                        config=chart_config,
-                        className="dashboard-chart"
-                    ),
-                    dbc.Card([
-                        dbc.CardBody([
-                            create_cost_card("CUSTO MENSAL", calculate_costs(initial_data).get('custo_mensal', 0), "fa-money-bill-wave", colors['primary']),
-                            create_cost_card("META", calculate_costs(initial_data).get('meta', 0), "fa-bullseye", colors['positive'])
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("QUALIDADE", className="section-header")),
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='sucata-chart',
+                            figure=figures[2],
+                            config=chart_config,
+                            className="dashboard-chart"
+                        ),
+                        dcc.Graph(
+                            id='retrabalho-chart',
+                            figure=figures[3],
+                            config=chart_config,
+                            className="dashboard-chart"
+                        )
+                    ])
+                ], className="dashboard-card")
+            ], lg=4, md=6, sm=12),
+        
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("PRODUÇÃO", className="section-header")),
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='producao-chart',
+                            figure=figures[4],
+                            config=chart_config,
+                            className="dashboard-chart"
+                        ),
+                        dbc.Card([
+                            dbc.CardBody([
+                                create_cost_card("CUSTO MENSAL", costs.get('custo_mensal', 0), "fa-money-bill-wave", colors['primary']),
+                                create_cost_card("META", costs.get('meta', 0), "fa-bullseye", colors['positive'])
+                            ])
+                        ], className="custo-card")
+                    ])
+                ], className="dashboard-card")
+            ], lg=4, md=12, sm=12),
+        ], className="mb-2"),
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("PESSOAS", className="section-header")),
+                    dbc.CardBody([
+                        dbc.Row([
+                            dbc.Col([
+                                dcc.Graph(
+                                    id='horas-extras-chart',
+                                    figure=figures[5],
+                                    config=chart_config,
+                                    className="dashboard-chart"
+                                )
+                            ], md=4, sm=12),
+                            dbc.Col([
+                                dcc.Graph(
+                                    id='treinamentos-chart',
+                                    figure=figures[6],
+                                    config=chart_config,
+                                    className="dashboard-chart"
+                                )
+                            ], md=4, sm=12),
+                            dbc.Col([
+                                dcc.Graph(
+                                    id='faltas-chart',
+                                    figure=figures[7],
+                                    config=chart_config,
+                                    className="dashboard-chart"
+                                )
+                            ], md=4, sm=12)
                         ])
-                    ], className="custo-card")
-                ])
-            ], className="dashboard-card")
-        ], lg=4, md=12, sm=12),
-    ], className="mb-2"),
-    dbc.Row([
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader(html.H4("PESSOAS", className="section-header")),
-                dbc.CardBody([
-                    dbc.Row([
-                        dbc.Col([
-                            dcc.Graph(
-                                id='horas-extras-chart',
-                                figure=generate_graphs(initial_data)[5],
-                                config=chart_config,
-                                className="dashboard-chart"
-                            )
-                        ], md=4, sm=12),
-                        dbc.Col([
-                            dcc.Graph(
-                                id='treinamentos-chart',
-                                figure=generate_graphs(initial_data)[6],
-                                config=chart_config,
-                                className="dashboard-chart"
-                            )
-                        ], md=4, sm=12),
-                        dbc.Col([
-                            dcc.Graph(
-                                id='faltas-chart',
-                                figure=generate_graphs(initial_data)[7],
-                                config=chart_config,
-                                className="dashboard-chart"
-                            )
-                        ], md=4, sm=12)
                     ])
-                ])
-            ], className="dashboard-card")
-        ], lg=8, md=12, sm=12),
+                ], className="dashboard-card")
+            ], lg=8, md=12, sm=12),
         
-        dbc.Col([
-            dbc.Card([
-                dbc.CardHeader(html.H4("INTERRUPÇÃO", className="section-header")),
-                dbc.CardBody([
-                    dcc.Graph(
-                        id='interrupcao-chart',
-                        figure=generate_graphs(initial_data)[8],
-                        config=chart_config,
-                        className="dashboard-chart"
-                    )
-                ])
-            ], className="dashboard-card")
-        ], lg=4, md=12, sm=12),
-    ], className="mb-2"),
-    
-    dbc.Row([
-        dbc.Col([
-            html.Div([
-                html.P("Dashboard atualizado em " + datetime.now().strftime("%d/%m/%Y %H:%M:%S"), className="footer-text"),
-                html.P("© 2025 - Gestão Laminação a Frio", className="footer-text"),
-                html.A("Acessar Formulário de Entrada", href="/form", className="btn btn-primary", style={'margin-top': '10px'})
-            ], className="footer")
-        ], width=12)
-    ])
-], fluid=True, className="dashboard-container", style={
-    'min-height': '100vh',
-    'overflow-x': 'hidden',
-    'margin': '0 auto',
-    'padding': '10px'
-})
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("INTERRUPÇÃO", className="section-header")),
+                    dbc.CardBody([
+                        dcc.Graph(
+                            id='interrupcao-chart',
+                            figure=figures[8],
+                            config=chart_config,
+                            className="dashboard-chart"
+                        )
+                    ])
+                ], className="dashboard-card")
+            ], lg=4, md=12, sm=12),
+        ], className="mb-2"),
+    
+        dbc.Row([
+            dbc.Col([
+                html.Div([
+                    html.P("Dashboard atualizado em " + datetime.now().strftime("%d/%m/%Y %H:%M:%S"), className="footer-text"),
+                    html.P("© 2025 - Gestão Laminação a Frio", className="footer-text"),
+                    html.A("Acessar Formulário de Entrada", href=f"/line/{store.line}/form", className="btn btn-primary", style={'margin-top': '10px'})
+                ], className="footer")
+            ], width=12)
+        ])
+    ], fluid=True, className="dashboard-container", style={
+        'min-height': '100vh',
+        'overflow-x': 'hidden',
+        'margin': '0 auto',
+        'padding': '10px'
+    })
+
+ROLLUP_COLUMNS = [
+    ('Produção', 'kpis', 'producao_atual'),
+    ('Meta', 'costs', 'meta'),
+    ('Custo Mensal', 'costs', 'custo_mensal'),
+    ('Acidentes', 'kpis', 'total_acidentes'),
+    ('Sucata', 'kpis', 'sucata_total'),
+    ('Retrabalho', 'kpis', 'retrabalho_total'),
+    ('Horas Extras', 'kpis', 'horas_extras_total')
+]
+
+def calculate_rollup():
+    rollup = {}
+    for line in known_lines():
+        rollup[line] = get_store(line).aggregates()
+    return rollup
+
+def build_rollup_table(rollup):
+    header_row = html.Tr([html.Th("Linha")] + [html.Th(label) for label, _, _ in ROLLUP_COLUMNS])
+    
+    rows = []
+    totals = defaultdict(float)
+    for line, aggregates in rollup.items():
+        cells = [html.Td(html.A(line.upper(), href=f"/line/{line}/"))]
+        for label, group, key in ROLLUP_COLUMNS:
+            value = aggregates[group].get(key, 0)
+            totals[label] += value
+            cells.append(html.Td(f"{value:,.2f}"))
+        rows.append(html.Tr(cells))
+    
+    rows.append(html.Tr(
+        [html.Th("TOTAL")] + [html.Th(f"{totals[label]:,.2f}") for label, _, _ in ROLLUP_COLUMNS]
+    ))
+    
+    return dbc.Table([html.Thead(header_row), html.Tbody(rows)], bordered=True, hover=True, striped=True)
+
+def build_rollup():
+    return dbc.Container([
+        build_header(f"{DEFAULT_TITLE} - VISÃO CONSOLIDADA"),
+        
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H4("LINHAS", className="section-header")),
+                    dbc.CardBody(build_rollup_table(calculate_rollup()), id='rollup-table')
+                ], className="dashboard-card")
+            ], width=12)
+        ], className="mb-2")
+    ], fluid=True, className="dashboard-container", style={
+        'min-height': '100vh',
+        'overflow-x': 'hidden',
+        'margin': '0 auto',
+        'padding': '10px'
+    })
+
+app.layout = html.Div([
+    dcc.Location(id='url', refresh=False),
+    dcc.Interval(
+        id='interval-component',
+        interval=5*1000,
+        n_intervals=0
+    ),
+    html.Div(id='page-content')
+])
+
+@app.callback(
+    Output('page-content', 'children'),
+    [Input('url', 'pathname')]
+)
+def display_page(pathname):
+    if pathname and pathname.strip('/') == 'rollup':
+        return build_rollup()
+    
+    line = line_from_path(pathname)
+    if line is None:
+        return html.H3("Linha não encontrada", className="text-center mt-5")
+    
+    return build_dashboard(get_store(line))
+
+def resolve_store(line):
+    if not is_valid_line(line):
+        return None, (jsonify({'error': f'Linha não encontrada: {line}'}), 404)
+    return get_store(line), None
 
 @app.server.route('/form')
-def serve_form():
+@app.server.route('/line/<line>/form')
+def serve_form(line=DEFAULT_LINE):
+    if not is_valid_line(line):
+        return jsonify({'error': f'Linha não encontrada: {line}'}), 404
     return send_from_directory(os.path.dirname(os.path.abspath(__file__)), 'form.html')
 
-@app.server.route('/api/add_data', methods=['POST'])
-def add_data():
+@app.server.route('/api/<line>/add_data', methods=['POST'])
+def add_data(line):
+    store, error = resolve_store(line)
+    if error:
+        return error
+    
     try:
         new_data = request.json
         
         if not all(key in new_data for key in ['Turma']):
             return jsonify({'error': 'Dados incompletos - Turma é obrigatória'}), 400
-            
-        current_data = load_data()
         
         turma = new_data['Turma']
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -638,6 +928,7 @@ def add_data():
             'Meta': new_data.get('Meta', 0)
         }
         
+        new_records = []
         for tipo, valor in indicators.items():
             if valor != 0:
                 record = {
@@ -646,19 +937,51 @@ def add_data():
                     'Valor': float(valor),
                     'Timestamp': timestamp
                 }
-                current_data.append(record)
+                new_records.append(record)
+        
+        if not new_records:
+            return jsonify({'success': True, 'alerts': []}), 200
         
-        save_data(current_data)
+        with store.lock:
+            store.append(new_records)
+            try:
+                alerts = alert_engine.evaluate(line, new_records, history=store.records)
+            except Exception:
+                logger.exception("Falha ao avaliar alertas da linha %s", line)
+                alerts = []
         
+        alert_engine.publish(alerts)
+        
+        return jsonify({'success': True, 'alerts': alerts}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.server.route('/api/<line>/clear_data', methods=['POST'])
+def clear_data(line):
+    store, error = resolve_store(line)
+    if error:
+        return error
+    
+    try:
+        with store.lock:
+            store.clear()
+            alert_engine.reset(line)
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.server.route('/api/add_data', methods=['POST'])
+def add_data_default_line():
+    return add_data(DEFAULT_LINE)
+
 @app.server.route('/api/clear_data', methods=['POST'])
-def clear_data():
+def clear_data_default_line():
+    return clear_data(DEFAULT_LINE)
+
+@app.server.route('/api/rollup')
+def rollup_data():
     try:
-        save_data([])
-        return jsonify({'success': True}), 200
+        return jsonify(calculate_rollup()), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -672,20 +995,33 @@ def clear_data():
      Output('treinamentos-chart', 'figure'),
      Output('faltas-chart', 'figure'),
      Output('interrupcao-chart', 'figure'),
-     Output('dashboard-title', 'children')],
-    [Input('interval-component', 'n_intervals')]
+     Output('dashboard-title', 'children'),
+     Output('alert-banner', 'children')],
+    [Input('interval-component', 'n_intervals')],
+    [State('url', 'pathname')]
 )
-def update_all_charts(n_intervals):
-    data = load_data()
-    df = pd.DataFrame(data)
+def update_all_charts(n_intervals, pathname):
+    line = line_from_path(pathname)
+    if line is None:
+        raise PreventUpdate
+    
+    store = get_store(line)
     
     (fig_relatos, fig_acidentes, fig_sucata, fig_retrabalho, fig_producao,
-     fig_horas_extras, fig_treinamentos, fig_faltas, fig_interrupcao) = generate_graphs(df)
+     fig_horas_extras, fig_treinamentos, fig_faltas, fig_interrupcao) = store.figures()
     
-    title = f"GESTÃO LAMINAÇÃO A FRIO (Atualizado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')})"
+    title = f"{store.title} (Atualizado: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')})"
     
     return (fig_relatos, fig_acidentes, fig_sucata, fig_retrabalho, fig_producao,
-            fig_horas_extras, fig_treinamentos, fig_faltas, fig_interrupcao, title)
+            fig_horas_extras, fig_treinamentos, fig_faltas, fig_interrupcao, title,
+            build_alert_banner(line))
+
+@app.callback(
+    Output('rollup-table', 'children'),
+    [Input('interval-component', 'n_intervals')]
+)
+def update_rollup(n_intervals):
+    return build_rollup_table(calculate_rollup())
 
 if __name__ == '__main__':
     app.run(debug=True,host='192.168.0.5')
\ No newline at end of file